@@ -3,39 +3,58 @@
 
 import json
 import sys
+import types
+
+try:
+    # orjson parses directly from bytes and is much faster on nested
+    # findings structures; fall back to stdlib json to stay portable
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Category icons (module-level, read-only: one shared mapping for all findings)
+_CATEGORY_ICONS = types.MappingProxyType({
+    'security': '🔒',
+    'performance': '⚡',
+    'maintainability': '🔧',
+    'style': '💅',
+    'logic': '🧠',
+    'documentation': '📝'
+})
+_DEFAULT_ICON = '📌'
+
+# Precompiled detail template shared by every finding
+_FINDING_TEMPLATE = (
+    "**{icon} {cat_title}** · {location}\n"
+    "\n"
+    "**Issue:** {message}\n"
+    "\n"
+    "**💡 Suggestion:** {suggestion}\n"
+)
 
 
 def format_finding_details(finding):
     """Format a single finding with nice structure."""
-    lines = []
     location = f"`{finding['file']}:{finding['line']}`" if finding.get('line') else f"`{finding['file']}`"
-    
-    # Category icons
-    category_icons = {
-        'security': '🔒',
-        'performance': '⚡',
-        'maintainability': '🔧',
-        'style': '💅',
-        'logic': '🧠',
-        'documentation': '📝'
-    }
-    icon = category_icons.get(finding.get('category', '').lower(), '📌')
-    
-    lines.append(f"**{icon} {finding['category'].title()}** · {location}")
-    lines.append("")
-    lines.append(f"**Issue:** {finding['message']}")
-    lines.append("")
-    lines.append(f"**💡 Suggestion:** {finding['suggestion']}")
-    lines.append("")
-    
-    return "\n".join(lines)
+    cat = finding.get('category', '')
+
+    return _FINDING_TEMPLATE.format_map({
+        'icon': _CATEGORY_ICONS.get(cat.lower(), _DEFAULT_ICON),
+        'cat_title': cat.title(),
+        'location': location,
+        'message': finding['message'],
+        'suggestion': finding['suggestion'],
+    })
 
 
 def main():
     try:
-        # Load review data
-        with open('review.json', 'r') as f:
-            review = json.load(f)
+        # Load review data (bytes; both parsers handle UTF-8 directly and
+        # skip the TextIOWrapper decoding layer)
+        with open('review.json', 'rb') as f:
+            review = _loads(f.read())
         
         summary = review.get('summary', 'Code review completed')
         score = review.get('score', 0)
@@ -44,136 +63,131 @@ def main():
         model = metadata.get('model', 'unknown')
         execution_time = metadata.get('execution_time_ms', 0)
         
-        # Group by severity
-        critical = [f for f in findings if f['severity'] == 'critical']
-        high = [f for f in findings if f['severity'] == 'high']
-        medium = [f for f in findings if f['severity'] == 'medium']
-        low = [f for f in findings if f['severity'] == 'low']
-        
-        # Build markdown
-        md = []
+        # Group by severity in a single pass over findings
+        buckets = {'critical': [], 'high': [], 'medium': [], 'low': []}
+        for f in findings:
+            bucket = buckets.get(f['severity'])
+            if bucket is not None:
+                bucket.append(f)
+        critical, high, medium, low = (
+            buckets['critical'], buckets['high'], buckets['medium'], buckets['low']
+        )
         
+        # Stream each rendered section straight to the (buffered) file
+        # instead of accumulating the whole report in memory first: peak
+        # memory stays at one section, not list + joined string.
+        out = open('review_comment.md', 'wb', buffering=65536)
+
+        def emit(section: str, _write=out.write) -> None:
+            _write(section.encode())
+            _write(b"\n")
+
         # Header
-        md.append("# 🤖 AI Code Review Report")
-        md.append("")
-        
+        emit("# 🤖 AI Code Review Report\n")
+
         # Critical Issues Alert
         if critical:
-            md.append("> [!WARNING]")
-            md.append("> ### ⚠️ Critical Issues Detected")
-            md.append(">")
-            md.append(f"> Found **{len(critical)} critical** issue(s) that require immediate attention!")
-            md.append("> Please address these before merging.")
-            md.append("")
-        
+            emit(
+                f"""> [!WARNING]
+> ### ⚠️ Critical Issues Detected
+>
+> Found **{len(critical)} critical** issue(s) that require immediate attention!
+> Please address these before merging.
+"""
+            )
+
         # Summary Table
         score_emoji = "🟢" if score >= 8 else "🟡" if score >= 6 else "🟠" if score >= 4 else "🔴"
-        
-        md.append("## 📊 Review Summary")
-        md.append("")
-        md.append("| Metric | Value |")
-        md.append("|--------|-------|")
-        md.append(f"| **Quality Score** | {score_emoji} **{score:.1f}/10** |")
-        md.append(f"| **Total Issues** | {len(findings)} |")
-        md.append(f"| 🔴 Critical | {len(critical)} |")
-        md.append(f"| 🟠 High | {len(high)} |")
-        md.append(f"| 🟡 Medium | {len(medium)} |")
-        md.append(f"| 🟢 Low | {len(low)} |")
-        md.append("")
-        
+
+        emit(
+            f"""## 📊 Review Summary
+
+| Metric | Value |
+|--------|-------|
+| **Quality Score** | {score_emoji} **{score:.1f}/10** |
+| **Total Issues** | {len(findings)} |
+| 🔴 Critical | {len(critical)} |
+| 🟠 High | {len(high)} |
+| 🟡 Medium | {len(medium)} |
+| 🟢 Low | {len(low)} |
+"""
+        )
+
         # Summary Text
         if findings:
-            md.append("### 💭 Overall Assessment")
-            md.append("")
-            md.append(f"> {summary}")
-            md.append("")
-        
+            emit(f"### 💭 Overall Assessment\n\n> {summary}\n")
+
         # Findings sections
         if not findings:
-            md.append("---")
-            md.append("")
-            md.append("## ✅ Excellent Work!")
-            md.append("")
-            md.append("No issues found in this pull request. The code looks great! 🎉")
-            md.append("")
+            emit(
+                """---
+
+## ✅ Excellent Work!
+
+No issues found in this pull request. The code looks great! 🎉
+"""
+            )
         else:
-            # Critical Issues
-            if critical:
-                md.append("---")
-                md.append("")
-                md.append("## 🔴 Critical Issues")
-                md.append("")
-                for idx, finding in enumerate(critical, 1):
-                    md.append(f"<details open>")
-                    md.append(f"<summary><b>#{idx} · {finding.get('category', 'Issue').title()}</b> in <code>{finding.get('file', 'unknown')}</code></summary>")
-                    md.append("")
-                    md.append(format_finding_details(finding))
-                    md.append("</details>")
-                    md.append("")
-            
-            # High Severity Issues
-            if high:
-                md.append("---")
-                md.append("")
-                md.append("## 🟠 High Severity Issues")
-                md.append("")
-                for idx, finding in enumerate(high, 1):
-                    md.append(f"<details open>")
-                    md.append(f"<summary><b>#{idx} · {finding.get('category', 'Issue').title()}</b> in <code>{finding.get('file', 'unknown')}</code></summary>")
-                    md.append("")
-                    md.append(format_finding_details(finding))
-                    md.append("</details>")
-                    md.append("")
-            
-            # Medium Severity Issues (Collapsed by default)
-            if medium:
-                md.append("---")
-                md.append("")
-                md.append("<details>")
-                md.append(f"<summary><h2>🟡 Medium Severity Issues ({len(medium)})</h2></summary>")
-                md.append("")
-                for idx, finding in enumerate(medium, 1):
-                    md.append(f"### #{idx} · {finding.get('category', 'Issue').title()}")
-                    md.append("")
-                    md.append(format_finding_details(finding))
-                    if idx < len(medium):
-                        md.append("---")
-                        md.append("")
-                md.append("</details>")
-                md.append("")
-            
-            # Low Severity Issues (Collapsed by default)
-            if low:
-                md.append("---")
-                md.append("")
-                md.append("<details>")
-                md.append(f"<summary><h2>🟢 Low Severity Issues ({len(low)})</h2></summary>")
-                md.append("")
-                for idx, finding in enumerate(low, 1):
-                    md.append(f"### #{idx} · {finding.get('category', 'Issue').title()}")
-                    md.append("")
-                    md.append(format_finding_details(finding))
-                    if idx < len(low):
-                        md.append("---")
-                        md.append("")
-                md.append("</details>")
-                md.append("")
-        
-        # Footer
-        md.append("---")
-        md.append("")
-        md.append("<div align='center'>")
-        md.append("")
-        md.append(f"🤖 *Powered by AI Code Review Agents*")
-        md.append("")
-        md.append(f"Model: `{model}` · Execution Time: `{execution_time}ms`")
-        md.append("")
-        md.append("</div>")
-        
-        # Join and write
-        markdown = "\n".join(md)
-        with open('review_comment.md', 'w') as f:
-            f.write(markdown)
+            # One data-driven loop over (title, findings, expanded):
+            # critical/high render each finding in its own open <details>,
+            # medium/low collapse the whole section by default.
+            sections = (
+                ('🔴 Critical Issues', critical, True),
+                ('🟠 High Severity Issues', high, True),
+                ('🟡 Medium Severity Issues', medium, False),
+                ('🟢 Low Severity Issues', low, False),
+            )
+            for title, items, expanded in sections:
+                if not items:
+                    continue
+                if expanded:
+                    # Pass a list (not a generator) to join: str.join
+                    # materializes its argument to a list internally anyway.
+                    section = "\n".join(
+                        [
+                            f"""<details open>
+<summary><b>#{idx} · {finding.get('category', 'Issue').title()}</b> in <code>{finding.get('file', 'unknown')}</code></summary>
+
+{format_finding_details(finding)}
+</details>
+"""
+                            for idx, finding in enumerate(items, 1)
+                        ]
+                    )
+                    emit(f"---\n\n## {title}\n\n{section}")
+                else:
+                    section = "---\n\n".join(
+                        [
+                            f"""### #{idx} · {finding.get('category', 'Issue').title()}
+
+{format_finding_details(finding)}
+"""
+                            for idx, finding in enumerate(items, 1)
+                        ]
+                    )
+                    emit(
+                        f"""---
+
+<details>
+<summary><h2>{title} ({len(items)})</h2></summary>
+
+{section}</details>
+"""
+                    )
+
+        # Footer (no trailing newline, written directly)
+        out.write(
+            f"""---
+
+<div align='center'>
+
+🤖 *Powered by AI Code Review Agents*
+
+Model: `{model}` · Execution Time: `{execution_time}ms`
+
+</div>""".encode()
+        )
+        out.close()
         
         print("✅ Review formatted successfully")
         
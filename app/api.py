@@ -1,5 +1,7 @@
 """FastAPI gateway for code review service."""
 
+import asyncio
+import hmac
 import logging
 import os
 import time
@@ -16,7 +18,7 @@ from app.config import config
 # Lazy import: get_crew imported after env cleanup in lifespan
 from app.guardrails import get_guardrail_orchestrator
 from app.schemas import HealthResponse, ReviewRequest, ReviewResponse
-from app.utils import generate_request_id, sanitize_diff
+from app.utils import count_tokens, generate_request_id, sanitize_diff
 
 # Configure logging
 config.configure_logging()
@@ -25,8 +27,17 @@ logger = logging.getLogger(__name__)
 # Security
 security = HTTPBearer()
 
-# Rate limiting (simple in-memory store for MVP)
-request_timestamps: dict[str, list[float]] = {}
+# Expected API key cached as bytes so verification does a single
+# constant-time compare instead of re-reading config per request
+_EXPECTED_KEY_BYTES = config.review_api_key.encode("utf-8")
+
+# Rate limiting: in-memory token bucket per API key, stored as
+# (remaining tokens, last refill in monotonic ns). Two floats of state
+# per key instead of a growing timestamp list.
+_rate_buckets: dict[str, tuple[float, int]] = {}
+
+# Drop buckets untouched for this long so idle keys cannot accumulate
+_RATE_BUCKET_IDLE_NS = 300 * 1_000_000_000
 
 
 @asynccontextmanager
@@ -49,18 +60,95 @@ async def lifespan(app: FastAPI):
         logger.info("✓ Removed GROQ_API_KEY from environment (using OpenAI)")
 
     # Initialize crew (warm up) - import here after env cleanup
+    app.state.crew = None
     try:
         from app.crew.crew import get_crew
-        get_crew()
+        app.state.crew = get_crew()
         logger.info("Code review crew initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize crew: {e}")
 
+    # Prime the guardrail orchestrator once so the request path reads
+    # app.state instead of repeating singleton lookups
+    app.state.guardrails = get_guardrail_orchestrator()
+
+    # Pre-warm the tokenizer so the first request does not pay the cold
+    # BPE-table build. On a first-ever run tiktoken fetches vocabulary
+    # over the network, so this belongs in startup (slow warm-up is
+    # tolerated and logged here), never at module import
+    try:
+        count_tokens("warmup")
+        logger.info("Tokenizer encoding pre-warmed")
+    except Exception as e:
+        logger.warning(f"Could not pre-warm tiktoken encoding: {e}")
+
+    # Bound in-flight reviews to the real LLM concurrency ceiling; the
+    # async crew path multiplexes on the event loop, so a semaphore
+    # replaces the former dedicated thread pool
+    app.state.review_semaphore = asyncio.Semaphore(config.ray_max_concurrent_queries)
+
+    # Sweep idle rate-limit buckets so inactive keys do not leak memory
+    async def sweep_rate_buckets() -> None:
+        while True:
+            await asyncio.sleep(60)
+            cutoff = time.monotonic_ns() - _RATE_BUCKET_IDLE_NS
+            for key in [k for k, (_, last) in _rate_buckets.items() if last < cutoff]:
+                _rate_buckets.pop(key, None)
+
+    sweeper = asyncio.create_task(sweep_rate_buckets())
+
     yield
 
+    sweeper.cancel()
     logger.info("Shutting down Code Reviewer CI Agent API")
 
 
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware that logs all requests with timing.
+
+    Avoids the extra task group and Request/Response objects that
+    Starlette's BaseHTTPMiddleware creates per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = generate_request_id()
+        start_ns = time.perf_counter_ns()
+
+        # Add request ID to state (Request.state reads scope["state"])
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        client = scope.get("client")
+        logger.info(
+            "[%s] %s %s - Client: %s",
+            request_id,
+            scope["method"],
+            scope["path"],
+            client[0] if client else "unknown",
+        )
+
+        status_code = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        logger.info(
+            "[%s] Completed in %dms - Status: %d", request_id, duration_ms, status_code
+        )
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Code Reviewer CI Agent",
@@ -78,30 +166,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Middleware for request logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all requests with timing."""
-    request_id = generate_request_id()
-    start_time = time.time()
-
-    # Add request ID to state
-    request.state.request_id = request_id
-
-    logger.info(
-        f"[{request_id}] {request.method} {request.url.path} - "
-        f"Client: {request.client.host if request.client else 'unknown'}"
-    )
-
-    response = await call_next(request)
-
-    duration_ms = int((time.time() - start_time) * 1000)
-    logger.info(
-        f"[{request_id}] Completed in {duration_ms}ms - Status: {response.status_code}"
-    )
-
-    return response
+# Request logging middleware (pure ASGI, see class above)
+app.add_middleware(RequestLoggingMiddleware)
 
 
 def verify_api_key(
@@ -124,9 +190,10 @@ def verify_api_key(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if credentials.credentials != config.review_api_key:
-        # Log first 10 chars only for security
-        logger.warning(f"Invalid API key attempt: {credentials.credentials[:10]}...")
+    if not hmac.compare_digest(credentials.credentials.encode("utf-8"), _EXPECTED_KEY_BYTES):
+        # Log first 10 chars only for security (lazy %-formatting: the
+        # string is only built when the warning is actually emitted)
+        logger.warning("Invalid API key attempt: %s...", credentials.credentials[:10])
         raise HTTPException(
             status_code=401,
             detail="Invalid authentication credentials",
@@ -146,30 +213,25 @@ def check_rate_limit(api_key: str) -> None:
     Raises:
         HTTPException: If rate limit exceeded
     """
-    current_time = time.time()
-    minute_ago = current_time - 60
-
-    # Clean up old timestamps
-    if api_key in request_timestamps:
-        request_timestamps[api_key] = [
-            ts for ts in request_timestamps[api_key] if ts > minute_ago
-        ]
-    else:
-        request_timestamps[api_key] = []
-
-    # Check limit
-    if len(request_timestamps[api_key]) >= config.rate_limit_per_minute:
-        logger.warning(f"Rate limit exceeded for API key: {api_key[:10]}...")
+    limit = config.rate_limit_per_minute
+    now = time.monotonic_ns()
+
+    # Refill proportionally to the time elapsed since the last request
+    # (monotonic, so immune to NTP/wall-clock jumps)
+    tokens, last_refill = _rate_buckets.get(api_key, (float(limit), now))
+    tokens = min(float(limit), tokens + (now - last_refill) / 60e9 * limit)
+
+    if tokens < 1.0:
+        logger.warning("Rate limit exceeded for API key: %s...", api_key[:10])
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Rate limit exceeded. Maximum {config.rate_limit_per_minute} requests per minute.",
         )
 
-    # Add current request
-    request_timestamps[api_key].append(current_time)
+    _rate_buckets[api_key] = (tokens - 1.0, now)
 
 
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
+@app.api_route("/health", methods=["GET", "HEAD"], response_model=HealthResponse, tags=["Health"])
 async def health_check() -> HealthResponse:
     """
     Health check endpoint.
@@ -188,6 +250,7 @@ async def health_check() -> HealthResponse:
 @app.post("/review", response_model=ReviewResponse, tags=["Review"])
 async def review_code(
     request: ReviewRequest,
+    http_request: Request,
     api_key: Annotated[str, Depends(verify_api_key)],
 ) -> ReviewResponse:
     """
@@ -206,28 +269,50 @@ async def review_code(
     # Check rate limit
     check_rate_limit(api_key)
 
-    logger.info(f"Received review request for {request.language} code")
+    logger.info("Received review request for %s code", request.language)
+
+    # Early-reject oversized diffs before sanitizing or occupying an
+    # executor thread. Two-stage check: the cheap character-count upper
+    # bound (UTF-8 is at most 4 bytes/char) short-circuits without
+    # encoding; only borderline diffs pay for the exact byte count.
+    if (
+        len(request.diff) * 4 > config.max_diff_size_bytes
+        and len(request.diff.encode("utf-8")) > config.max_diff_size_bytes
+    ):
+        logger.warning("Rejecting oversized diff (%d chars)", len(request.diff))
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Diff exceeds maximum size of {config.max_diff_size_bytes} bytes",
+        )
 
     try:
         # Sanitize diff
         sanitized_diff = sanitize_diff(request.diff)
         request.diff = sanitized_diff
 
-        # Get crew and execute review (lazy import)
-        from app.crew.crew import get_crew
-        crew = get_crew()
-
-        # Execute with timeout
-        import asyncio
-        from concurrent.futures import TimeoutError
+        # Crew, guardrails and the concurrency bound are primed on
+        # app.state at startup; fall back to the lazy singletons when
+        # lifespan has not run (ASGITransport in tests) or warm-up failed
+        state = http_request.app.state
+        crew = getattr(state, "crew", None)
+        if crew is None:
+            from app.crew.crew import get_crew
+            crew = state.crew = get_crew()
+
+        semaphore = getattr(state, "review_semaphore", None)
+        if semaphore is None:
+            semaphore = state.review_semaphore = asyncio.Semaphore(
+                config.ray_max_concurrent_queries
+            )
 
+        # Execute with timeout, awaiting the async crew path so the event
+        # loop multiplexes concurrent reviews instead of pinning threads
         try:
-            # Run crew in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await asyncio.wait_for(
-                loop.run_in_executor(None, crew.review_code, request),
-                timeout=config.request_timeout_seconds,
-            )
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    crew.areview_code(request),
+                    timeout=config.request_timeout_seconds,
+                )
         except asyncio.TimeoutError:
             logger.error("Review timed out")
             raise HTTPException(
@@ -236,7 +321,9 @@ async def review_code(
             )
 
         # Apply guardrails
-        orchestrator = get_guardrail_orchestrator()
+        orchestrator = getattr(state, "guardrails", None)
+        if orchestrator is None:
+            orchestrator = state.guardrails = get_guardrail_orchestrator()
         response = orchestrator.apply(
             response,
             context={
@@ -246,8 +333,9 @@ async def review_code(
         )
 
         logger.info(
-            f"Review completed successfully: {len(response.findings)} findings, "
-            f"score: {response.score:.1f}"
+            "Review completed successfully: %d findings, score: %.1f",
+            len(response.findings),
+            response.score,
         )
 
         return response
@@ -255,7 +343,7 @@ async def review_code(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error during code review: {e}", exc_info=True)
+        logger.error("Error during code review: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code review failed: {str(e)}",
@@ -278,7 +366,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -2,15 +2,21 @@
 
 import logging
 import os
+from functools import cached_property
 from typing import Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Evaluated once at import: the Spaces environment cannot change mid-process
+_IS_HUGGINGFACE_SPACE = (
+    os.getenv("SPACE_ID") is not None or os.getenv("SPACE_REPO_NAME") is not None
+)
+
 
 def is_huggingface_space() -> bool:
     """Detect if running in Hugging Face Spaces environment."""
-    return os.getenv("SPACE_ID") is not None or os.getenv("SPACE_REPO_NAME") is not None
+    return _IS_HUGGINGFACE_SPACE
 
 
 class AppConfig(BaseSettings):
@@ -50,6 +56,17 @@ class AppConfig(BaseSettings):
         10, ge=1, le=100, description="Max concurrent queries per replica"
     )
 
+    # LLM Response Cache Configuration
+    enable_llm_cache: bool = Field(
+        True, description="Cache review results by diff hash to skip repeat LLM runs"
+    )
+    llm_cache_max_entries: int = Field(
+        256, ge=1, le=10000, description="Maximum cached reviews (LRU eviction)"
+    )
+    llm_cache_ttl_seconds: int = Field(
+        3600, ge=60, le=86400, description="Cached review time-to-live in seconds"
+    )
+
     # Guardrails Configuration
     max_findings_per_review: int = Field(
         20, ge=1, le=100, description="Maximum findings to return"
@@ -94,14 +111,14 @@ class AppConfig(BaseSettings):
             raise ValueError(f"Invalid log level: {v}. Must be one of {valid_levels}")
         return v_upper
 
-    @property
-    def cors_origins_list(self) -> list[str]:
-        """Parse CORS origins into a list."""
+    @cached_property
+    def cors_origins_list(self) -> tuple[str, ...]:
+        """Parse CORS origins into a tuple (computed once per process)."""
         if self.cors_origins == "*":
-            return ["*"]
-        return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
+            return ("*",)
+        return tuple(origin.strip() for origin in self.cors_origins.split(",") if origin.strip())
 
-    @property
+    @cached_property
     def llm_api_key(self) -> str:
         """Get API key for the active LLM provider."""
         if self.llm_provider == "openai":
@@ -114,7 +131,7 @@ class AppConfig(BaseSettings):
             return self.groq_api_key
         raise ValueError(f"Unknown LLM provider: {self.llm_provider}")
 
-    @property
+    @cached_property
     def llm_model(self) -> str:
         """Get model name for the active LLM provider."""
         if self.llm_provider == "openai":
@@ -123,6 +140,10 @@ class AppConfig(BaseSettings):
             return self.groq_model
         raise ValueError(f"Unknown LLM provider: {self.llm_provider}")
 
+    def model_post_init(self, __context) -> None:
+        """Run one-shot startup optimizations after field validation."""
+        self.optimize_for_huggingface()
+
     def optimize_for_huggingface(self) -> None:
         """Automatically optimize settings for Hugging Face Spaces free tier."""
         if not is_huggingface_space():
@@ -162,8 +183,5 @@ class AppConfig(BaseSettings):
         )
 
 
-# Global config instance
+# Global config instance (HF auto-optimization runs in model_post_init)
 config = AppConfig()
-
-# Auto-optimize for Hugging Face if detected
-config.optimize_for_huggingface()
@@ -1,22 +1,53 @@
 """CrewAI orchestration for code review multi-agent system."""
 
-import json
+import asyncio
+import functools
 import logging
 import os
+import re
 import time
 from pathlib import Path
 from typing import Any, Optional
 
+import orjson
+import xxhash
 from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 import yaml
 
 from app.config import config
+from app.llm_cache import get_llm_cache
 from app.schemas import ReviewMetadata, ReviewRequest, ReviewResponse
+from app.trivial import is_trivial
 from app.utils import count_tokens, detect_language
 
 logger = logging.getLogger(__name__)
 
+# C-accelerated YAML loader when libyaml is present (5-10x faster than
+# the pure-Python SafeLoader); falls back transparently without it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _load_yaml(config_path: Path) -> dict:
+    """Load a YAML config file with the fastest available safe loader."""
+    with open(config_path, encoding="utf-8") as file:
+        return yaml.load(file, Loader=_YAML_LOADER) or {}
+
+
+# How much of the diff head language detection inspects: file headers
+# sit at the top of real PR diffs, so the classifier never needs the body
+_LANGUAGE_DETECTION_HEAD_BYTES = 4096
+
+
+@functools.lru_cache(maxsize=1024)
+def _detect_language_cached(diff_hash: int, head: str) -> str:
+    """Detect the diff language from its head, cached by full-diff hash."""
+    return detect_language(head)
+
+
+# Fenced JSON block in LLM output, e.g. ```json { ... } ```
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
 
 @CrewBase
 class CodeReviewCrew:
@@ -29,6 +60,12 @@ class CodeReviewCrew:
     def __init__(self):
         """Initialize the code review crew."""
         self.llm = self._initialize_llm()
+        # Crew object built once on first use and reused across kickoffs
+        # (agents and tasks are memoized by the decorators); per-request
+        # work is then just kickoff(inputs=...)
+        self._crew_instance: Optional[Crew] = None
+        # In-flight async reviews by cache key, for duplicate coalescing
+        self._inflight: dict[str, asyncio.Task] = {}
         logger.info(
             f"Initialized CodeReviewCrew with {config.llm_provider} "
             f"using model {config.llm_model}"
@@ -97,6 +134,7 @@ class CodeReviewCrew:
         """Create code analysis task."""
         return Task(
             config=self.tasks_config["analyze_code"],
+            async_execution=True,
         )
 
     @task
@@ -104,6 +142,7 @@ class CodeReviewCrew:
         """Create security review task."""
         return Task(
             config=self.tasks_config["review_security"],
+            async_execution=True,
         )
 
     @task
@@ -111,6 +150,7 @@ class CodeReviewCrew:
         """Create performance review task."""
         return Task(
             config=self.tasks_config["review_performance"],
+            async_execution=True,
         )
 
     @task
@@ -118,18 +158,32 @@ class CodeReviewCrew:
         """Create style review task."""
         return Task(
             config=self.tasks_config["review_style"],
+            async_execution=True,
         )
 
     @task
     def synthesize_review_task(self) -> Task:
-        """Create review synthesis task."""
+        """Create review synthesis task (waits on all specialist tasks)."""
         return Task(
             config=self.tasks_config["synthesize_review"],
+            context=[
+                self.analyze_code_task(),
+                self.review_security_task(),
+                self.review_performance_task(),
+                self.review_style_task(),
+            ],
+            async_execution=False,
         )
 
     @crew
     def crew(self) -> Crew:
-        """Create the code review crew with hybrid parallel-sequential execution."""
+        """Create the code review crew with hybrid parallel-sequential execution.
+
+        The four specialist tasks are marked async_execution=True, so the
+        sequential process launches their LLM calls concurrently and only
+        the synthesizer (whose context lists all four) waits on them:
+        one specialist wall-clock latency instead of four.
+        """
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
@@ -153,78 +207,219 @@ class CodeReviewCrew:
         """
         start_time = time.time()
 
-        # Auto-detect language if not provided or set to default
-        language = request.language
-        if language == "python" or not language:
-            detected = detect_language(request.diff)
-            if detected != "unknown":
-                language = detected
+        # Whitespace/comment/lockfile-only diffs get a canned response
+        canned = is_trivial(request.diff)
+        if canned is not None:
+            return canned
 
-        logger.info(
-            f"Starting code review for {language} code, "
-            f"diff size: {len(request.diff)} chars"
-        )
-
-        # Prepare inputs for the crew
-        inputs = {
-            "diff": request.diff,
-            "language": language,
-        }
+        language = self._resolve_language(request)
+        cache, cache_key, cached = self._check_cache(request, language, start_time)
+        if cached is not None:
+            return cached
 
         try:
-            # Execute the crew
-            result = self.crew().kickoff(inputs=inputs)
+            # Execute the crew (constructed once, reused across requests)
+            if self._crew_instance is None:
+                self._crew_instance = self.crew()
+            result = self._crew_instance.kickoff(
+                inputs={"diff": request.diff, "language": language}
+            )
+            return self._build_response(result, request, cache, cache_key, start_time)
+        except Exception as e:
+            return self._failure_response(e, start_time)
 
-            # Parse the result
-            review_data = self._parse_crew_output(result)
+    async def areview_code(self, request: ReviewRequest) -> ReviewResponse:
+        """
+        Async variant of review_code for event-loop servers.
 
-            # Calculate execution time
-            execution_time_ms = int((time.time() - start_time) * 1000)
+        Awaits the crew via kickoff_async so a FastAPI / Ray Serve event
+        loop can multiplex many in-flight reviews instead of pinning a
+        thread per LLM round-trip; review_code remains for sync callers.
 
-            # Count tokens (approximate)
-            total_tokens = count_tokens(request.diff + str(review_data), config.llm_model)
+        Args:
+            request: Review request with diff and context
 
-            # Create metadata
-            metadata = ReviewMetadata(
-                execution_time_ms=execution_time_ms,
-                tokens_used=total_tokens,
-                agent_count=5,
-                guardrails_applied=[],  # Will be populated by guardrails layer
-                model=config.llm_model,
-            )
+        Returns:
+            Structured review response
+        """
+        start_time = time.time()
 
-            # Create response
-            response = ReviewResponse(
-                summary=review_data.get("summary", "Code review completed"),
-                score=review_data.get("score", 8.0),
-                findings=review_data.get("findings", []),
-                metadata=metadata,
+        # Whitespace/comment/lockfile-only diffs get a canned response
+        canned = is_trivial(request.diff)
+        if canned is not None:
+            return canned
+
+        language = self._resolve_language(request)
+        cache, cache_key, cached = self._check_cache(request, language, start_time)
+        if cached is not None:
+            return cached
+
+        if cache_key is None:
+            return await self._kickoff_async(request, language, cache, cache_key, start_time)
+
+        # Coalesce concurrent duplicates: CI fan-out regularly submits the
+        # same diff several times in parallel, so followers await the
+        # leader's crew run instead of launching their own
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._kickoff_async(request, language, cache, cache_key, start_time)
             )
+            self._inflight[cache_key] = task
+            task.add_done_callback(
+                lambda _t, key=cache_key: self._inflight.pop(key, None)
+            )
+            return await task
+
+        logger.info("Coalescing duplicate in-flight review")
+        response = await task
+        # Followers get their own copy: guardrails mutate responses in place
+        return response.model_copy(deep=True)
+
+    async def _kickoff_async(
+        self,
+        request: ReviewRequest,
+        language: str,
+        cache,
+        cache_key,
+        start_time: float,
+    ) -> ReviewResponse:
+        """Run one async crew kickoff and assemble the response."""
+        try:
+            if self._crew_instance is None:
+                self._crew_instance = self.crew()
+            result = await self._crew_instance.kickoff_async(
+                inputs={"diff": request.diff, "language": language}
+            )
+            return self._build_response(result, request, cache, cache_key, start_time)
+        except Exception as e:
+            return self._failure_response(e, start_time)
 
-            logger.info(
-                f"Review completed: {len(response.findings)} findings, "
-                f"score: {response.score:.1f}, time: {execution_time_ms}ms"
+    def _resolve_language(self, request: ReviewRequest) -> str:
+        """Resolve the review language, auto-detecting when defaulted."""
+        # Auto-detect language if not provided or set to default. Only the
+        # diff head is scanned and the result is cached by content hash,
+        # so CI retries of the same diff skip even that
+        language = request.language
+        if language == "python" or not language:
+            detected = _detect_language_cached(
+                xxhash.xxh3_64_intdigest(request.diff.encode("utf-8")),
+                request.diff[:_LANGUAGE_DETECTION_HEAD_BYTES],
             )
+            if detected != "unknown":
+                language = detected
 
-            return response
+        logger.info(
+            f"Starting code review for {language} code, "
+            f"diff size: {len(request.diff)} chars"
+        )
+        return language
 
-        except Exception as e:
-            logger.error(f"Error during code review: {e}", exc_info=True)
-            # Return a fallback response
-            execution_time_ms = int((time.time() - start_time) * 1000)
-            metadata = ReviewMetadata(
+    def _check_cache(self, request: ReviewRequest, language: str, start_time: float):
+        """Look up a cached review for these exact inputs.
+
+        Returns:
+            Tuple of (cache, cache_key, cached_response); cached_response
+            is None on a miss or when the cache is disabled
+        """
+        # Short-circuit on a cache hit: identical (diff, language, model)
+        # inputs re-run constantly in CI (retries, force-pushes), and the
+        # crew runs at temperature 0.1, so the cached output is as good
+        # as a fresh one
+        cache = get_llm_cache() if config.enable_llm_cache else None
+        if cache is None:
+            return None, None, None
+
+        cache_key = cache.make_key(request.diff, language, config.llm_model)
+        cached = cache.get(cache_key)
+        if cached is None:
+            return cache, cache_key, None
+
+        logger.info("LLM cache hit, skipping crew execution")
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        response = ReviewResponse(
+            summary=cached["review"].get("summary", "Code review completed"),
+            score=cached["review"].get("score", 8.0),
+            findings=cached["review"].get("findings", []),
+            metadata=ReviewMetadata(
                 execution_time_ms=execution_time_ms,
-                tokens_used=0,
+                tokens_used=cached["tokens_used"],
                 agent_count=5,
                 guardrails_applied=[],
                 model=config.llm_model,
-            )
-            return ReviewResponse(
-                summary=f"Review failed: {str(e)}",
-                score=5.0,
-                findings=[],
-                metadata=metadata,
-            )
+            ),
+        )
+        return cache, cache_key, response
+
+    def _build_response(
+        self, result: Any, request: ReviewRequest, cache, cache_key, start_time: float
+    ) -> ReviewResponse:
+        """Parse a crew result into a ReviewResponse and cache it."""
+        # Parse the result
+        review_data = self._parse_crew_output(result)
+
+        # Calculate execution time
+        execution_time_ms = int((time.time() - start_time) * 1000)
+
+        # Token accounting: prefer the real usage reported by CrewAI,
+        # then fall back to a ~4 chars/token estimate. Running a full
+        # BPE tokenizer over the diff just to fill a metadata field is
+        # disproportionate; the exact count is kept for debug mode.
+        usage = getattr(result, "token_usage", None)
+        total_tokens = getattr(usage, "total_tokens", 0) or 0
+        if not total_tokens:
+            if config.debug:
+                total_tokens = count_tokens(
+                    request.diff + str(review_data), config.llm_model
+                )
+            else:
+                total_tokens = (len(request.diff) + len(str(review_data))) // 4
+
+        # Store for identical follow-up requests
+        if cache is not None:
+            cache.set(cache_key, {"review": review_data, "tokens_used": total_tokens})
+
+        # Create metadata
+        metadata = ReviewMetadata(
+            execution_time_ms=execution_time_ms,
+            tokens_used=total_tokens,
+            agent_count=5,
+            guardrails_applied=[],  # Will be populated by guardrails layer
+            model=config.llm_model,
+        )
+
+        # Create response
+        response = ReviewResponse(
+            summary=review_data.get("summary", "Code review completed"),
+            score=review_data.get("score", 8.0),
+            findings=review_data.get("findings", []),
+            metadata=metadata,
+        )
+
+        logger.info(
+            f"Review completed: {len(response.findings)} findings, "
+            f"score: {response.score:.1f}, time: {execution_time_ms}ms"
+        )
+
+        return response
+
+    def _failure_response(self, error: Exception, start_time: float) -> ReviewResponse:
+        """Build the fallback response for a failed review."""
+        logger.error(f"Error during code review: {error}", exc_info=True)
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        metadata = ReviewMetadata(
+            execution_time_ms=execution_time_ms,
+            tokens_used=0,
+            agent_count=5,
+            guardrails_applied=[],
+            model=config.llm_model,
+        )
+        return ReviewResponse(
+            summary=f"Review failed: {str(error)}",
+            score=5.0,
+            findings=[],
+            metadata=metadata,
+        )
 
     def _parse_crew_output(self, result: Any) -> dict:
         """
@@ -237,21 +432,22 @@ class CodeReviewCrew:
             Parsed review data
         """
         try:
-            # CrewAI result can be accessed via result.raw
-            output_str = str(result.raw) if hasattr(result, "raw") else str(result)
-
-            # Try to extract JSON from the output
-            # The synthesizer should return JSON, but we need to handle markdown code blocks
-            json_str = output_str
-
-            # Remove markdown code blocks if present
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                json_str = json_str.split("```")[1].split("```")[0].strip()
-
-            # Parse JSON
-            data = json.loads(json_str)
+            # CrewAI result can be accessed via result.raw; avoid the
+            # str() copy when it is already a string
+            raw = result.raw if hasattr(result, "raw") else result
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8", "replace")
+            elif not isinstance(raw, str):
+                raw = str(raw)
+
+            # The synthesizer should return JSON, but we need to handle
+            # markdown code blocks: one compiled-regex scan instead of
+            # repeated string splits
+            match = _JSON_BLOCK.search(raw)
+            json_str = match.group(1) if match else raw
+
+            # Parse JSON (orjson: C-level, parses str or bytes directly)
+            data = orjson.loads(json_str)
 
             # Validate structure
             if not isinstance(data, dict):
@@ -279,6 +475,11 @@ class CodeReviewCrew:
             }
 
 
+# CrewBase injects a yaml.safe_load-based load_yaml onto the class after
+# its body executes; re-point it at the C-accelerated loader here
+CodeReviewCrew.load_yaml = staticmethod(_load_yaml)
+
+
 # Singleton instance for reuse
 _crew_instance: Optional[CodeReviewCrew] = None
 
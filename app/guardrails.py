@@ -2,15 +2,60 @@
 
 import json
 import logging
+import re
 from abc import ABC, abstractmethod
 from typing import Tuple
 
+import xxhash
+
 from app.config import config
 from app.schemas import ReviewResponse, FindingSeverity
 from app.utils import extract_files_from_diff
 
 logger = logging.getLogger(__name__)
 
+# Severity sort order: one dict lookup per key evaluation instead of a
+# rebuilt list and linear index() scan
+SEVERITY_RANK = {
+    severity.value: rank
+    for rank, severity in enumerate(
+        [FindingSeverity.LOW, FindingSeverity.MEDIUM, FindingSeverity.HIGH, FindingSeverity.CRITICAL]
+    )
+}
+
+# Keywords that mark a security finding as too serious for LOW severity
+SERIOUS_SECURITY_KEYWORDS = (
+    "injection",
+    "xss",
+    "sql",
+    "authentication",
+    "authorization",
+    "credential",
+    "password",
+    "secret",
+    "token",
+)
+
+# One compiled alternation instead of K substring scans per finding;
+# IGNORECASE also avoids allocating a lowered copy of the message
+_SERIOUS_KEYWORD_RE = re.compile(
+    "|".join(map(re.escape, SERIOUS_SECURITY_KEYWORDS)), re.IGNORECASE
+)
+
+
+def _finding_fingerprint(finding) -> int:
+    """Build a 64-bit dedup fingerprint for a finding."""
+    return xxhash.xxh3_64_intdigest(
+        b"|".join(
+            (
+                finding.file.encode("utf-8", "ignore"),
+                str(finding.line).encode(),
+                finding.category.value.encode(),
+                finding.message[:50].lower().strip().encode("utf-8", "ignore"),
+            )
+        )
+    )
+
 
 class Guardrail(ABC):
     """Base class for guardrails."""
@@ -51,10 +96,7 @@ class MaxFindingsGuardrail(Guardrail):
         # Keep highest severity findings
         sorted_findings = sorted(
             response.findings,
-            key=lambda f: (
-                ["low", "medium", "high", "critical"].index(f.severity.value),
-                f.category.value,
-            ),
+            key=lambda f: (SEVERITY_RANK[f.severity.value], f.category.value),
             reverse=True,
         )
 
@@ -71,8 +113,11 @@ class FileNameValidationGuardrail(Guardrail):
         self, response: ReviewResponse, context: dict
     ) -> Tuple[bool, ReviewResponse, str]:
         """Validate file names against diff."""
-        diff = context.get("diff", "")
-        valid_files = set(extract_files_from_diff(diff))
+        # The orchestrator parses the diff once per review and shares the
+        # file set via context; fall back to parsing for direct callers
+        valid_files = context.get("_valid_files")
+        if valid_files is None:
+            valid_files = frozenset(extract_files_from_diff(context.get("diff", "")))
 
         if not valid_files:
             # If we can't extract files, skip validation
@@ -126,18 +171,13 @@ class DuplicateDetectionGuardrail(Guardrail):
         self, response: ReviewResponse, context: dict
     ) -> Tuple[bool, ReviewResponse, str]:
         """Remove duplicate findings based on file, line, and message similarity."""
-        seen = set()
+        seen: set[int] = set()
         unique_findings = []
 
         for finding in response.findings:
-            # Create a fingerprint for the finding
-            fingerprint = (
-                finding.file,
-                finding.line,
-                finding.category.value,
-                # Use first 50 chars of message for similarity
-                finding.message[:50].lower().strip(),
-            )
+            # Fingerprint as a 64-bit xxhash int: cheaper to hash and store
+            # than a tuple of strings (first 50 chars of message for similarity)
+            fingerprint = _finding_fingerprint(finding)
 
             if fingerprint not in seen:
                 seen.add(fingerprint)
@@ -162,24 +202,11 @@ class SeverityValidationGuardrail(Guardrail):
         # Downgrade security findings marked as "low" for serious vulnerabilities
         # This is a simple heuristic-based check
 
-        serious_keywords = [
-            "injection",
-            "xss",
-            "sql",
-            "authentication",
-            "authorization",
-            "credential",
-            "password",
-            "secret",
-            "token",
-        ]
-
         modified = False
         for finding in response.findings:
             if finding.category.value == "security" and finding.severity == FindingSeverity.LOW:
                 # Check if message contains serious keywords
-                message_lower = finding.message.lower()
-                if any(keyword in message_lower for keyword in serious_keywords):
+                if _SERIOUS_KEYWORD_RE.search(finding.message):
                     logger.warning(
                         f"Upgrading security finding severity from LOW to MEDIUM: {finding.message[:50]}"
                     )
@@ -221,14 +248,27 @@ class GuardrailOrchestrator:
             f"Applying guardrails to review with {len(response.findings)} findings"
         )
 
-        for guardrail in self.guardrails:
-            try:
-                is_valid, response, name = guardrail.validate(response, context)
-                if not is_valid:
-                    logger.warning(f"Guardrail {name} marked response as invalid")
-            except Exception as e:
-                logger.error(f"Error in guardrail {guardrail.__class__.__name__}: {e}")
-                # Continue with other guardrails
+        # Parse the diff's file set exactly once; every guardrail that
+        # needs it reads the shared value instead of rescanning the diff
+        context["_valid_files"] = frozenset(
+            extract_files_from_diff(context.get("diff", ""))
+        )
+
+        if config.debug:
+            # Debug mode keeps the individual guardrails observable
+            for guardrail in self.guardrails:
+                try:
+                    is_valid, response, name = guardrail.validate(response, context)
+                    if not is_valid:
+                        logger.warning(f"Guardrail {name} marked response as invalid")
+                except Exception as e:
+                    logger.error(f"Error in guardrail {guardrail.__class__.__name__}: {e}")
+                    # Continue with other guardrails
+        else:
+            response = self._fused_apply(response, context)
+
+        # Findings were rebound; drop the cached severity counts
+        response.__dict__.pop("severity_counts", None)
 
         logger.info(
             f"Guardrails applied: {response.metadata.guardrails_applied}, "
@@ -237,6 +277,87 @@ class GuardrailOrchestrator:
 
         return response
 
+    def _fused_apply(self, response: ReviewResponse, context: dict) -> ReviewResponse:
+        """Apply all guardrail checks in a single pass over the findings.
+
+        One iteration performs empty-message filtering, duplicate
+        detection, file validation and severity upgrades, followed by one
+        final sort+truncate - instead of five separate passes with
+        intermediate list rebuilds. Semantics match the individual
+        guardrails run in their registration order.
+        """
+        valid_files = context["_valid_files"]
+        if not valid_files:
+            logger.warning("Could not extract files from diff, skipping file validation")
+
+        seen: set[int] = set()
+        kept: list = []
+        empty_removed = duplicate_removed = invalid_file_removed = 0
+        severity_upgraded = False
+
+        for finding in response.findings:
+            # Empty/trivial message check
+            if not (
+                finding.message.strip()
+                and finding.suggestion.strip()
+                and len(finding.message) > 10
+                and len(finding.suggestion) > 10
+            ):
+                empty_removed += 1
+                continue
+
+            # Duplicate fingerprint (file, line, category, message head)
+            fingerprint = _finding_fingerprint(finding)
+            if fingerprint in seen:
+                duplicate_removed += 1
+                continue
+            seen.add(fingerprint)
+
+            # File reference must exist in the diff
+            if valid_files and finding.file not in valid_files and finding.file != "unknown":
+                invalid_file_removed += 1
+                continue
+
+            # Severity upgrade for serious LOW security findings
+            if finding.category.value == "security" and finding.severity == FindingSeverity.LOW:
+                if _SERIOUS_KEYWORD_RE.search(finding.message):
+                    logger.warning(
+                        f"Upgrading security finding severity from LOW to MEDIUM: {finding.message[:50]}"
+                    )
+                    finding.severity = FindingSeverity.MEDIUM
+                    severity_upgraded = True
+
+            kept.append(finding)
+
+        applied = response.metadata.guardrails_applied
+        if empty_removed:
+            logger.warning(f"Removed {empty_removed} findings with empty/trivial messages")
+            applied.append("empty_message")
+        if duplicate_removed:
+            logger.info(f"Removed {duplicate_removed} duplicate findings")
+            applied.append("duplicate_detection")
+        if invalid_file_removed:
+            logger.warning(
+                f"Removed {invalid_file_removed} findings with invalid file references"
+            )
+            applied.append("file_validation")
+        if severity_upgraded:
+            applied.append("severity_validation")
+
+        # Final cap on finding count, keeping the highest severities
+        max_findings = config.max_findings_per_review
+        if len(kept) > max_findings:
+            logger.warning(f"Truncating findings from {len(kept)} to {max_findings}")
+            kept.sort(
+                key=lambda f: (SEVERITY_RANK[f.severity.value], f.category.value),
+                reverse=True,
+            )
+            kept = kept[:max_findings]
+            applied.append("max_findings")
+
+        response.findings = kept
+        return response
+
 
 # Singleton instance
 _orchestrator: GuardrailOrchestrator | None = None
@@ -0,0 +1,115 @@
+"""In-memory cache for LLM review results keyed by diff content."""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """LRU + TTL cache for parsed review outputs.
+
+    CI retries, force-pushes and dev iteration frequently re-submit an
+    identical diff; a hit skips the entire multi-agent LLM run. Entries
+    are only meaningful while the crew runs at near-zero temperature,
+    where repeated runs on the same input are close to deterministic.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached reviews (LRU eviction)
+            ttl_seconds: Time-to-live per entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(diff: str, language: str, model: str) -> str:
+        """
+        Build a cache key from the review inputs.
+
+        Args:
+            diff: Sanitized diff content
+            language: Programming language of the diff
+            model: LLM model the review would run on
+
+        Returns:
+            Hex digest identifying this exact (diff, language, model) input
+        """
+        payload = json.dumps(
+            {"diff": diff, "lang": language, "model": model}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached review, honoring TTL.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached review data, or None on miss/expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        """
+        Store a review result, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key from make_key
+            value: Parsed review data to cache
+        """
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logger.debug("Evicted LLM cache entry %s", evicted_key[:12])
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+
+# Singleton instance
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create the singleton LLM response cache."""
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache(
+            max_entries=config.llm_cache_max_entries,
+            ttl_seconds=config.llm_cache_ttl_seconds,
+        )
+        logger.info(
+            "Initialized LLM response cache (max_entries=%d, ttl=%ds)",
+            config.llm_cache_max_entries,
+            config.llm_cache_ttl_seconds,
+        )
+    return _cache
@@ -1,9 +1,11 @@
 """Pydantic schemas for structured code review output."""
 
+from collections import Counter
 from enum import Enum
+from functools import cached_property
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class FindingCategory(str, Enum):
@@ -25,9 +27,27 @@ class FindingSeverity(str, Enum):
     CRITICAL = "critical"
 
 
+# Severity rendering order for markdown output (most severe first)
+_SEVERITY_ORDER = (
+    FindingSeverity.CRITICAL,
+    FindingSeverity.HIGH,
+    FindingSeverity.MEDIUM,
+    FindingSeverity.LOW,
+)
+_SEVERITY_INDEX = {severity: index for index, severity in enumerate(_SEVERITY_ORDER)}
+
+
 class ReviewFinding(BaseModel):
     """Individual code review finding."""
 
+    # Guardrails mutate findings in-process (e.g. severity upgrades);
+    # assignments must not re-trigger field validation on that trusted path.
+    # extra="ignore" (pinned) keeps stray LLM output keys out of instance
+    # dicts, which dominate per-finding memory on large reviews; BaseModel
+    # cannot be slotted, and a slotted dataclass would lose the field
+    # validation the untrusted LLM-output path needs.
+    model_config = ConfigDict(validate_assignment=False, extra="ignore")
+
     category: FindingCategory = Field(
         ..., description="Category of the issue (security, performance, style, logic, maintainability)"
     )
@@ -72,6 +92,13 @@ class ReviewRequest(BaseModel):
     def validate_diff_size(cls, v: str) -> str:
         """Ensure diff is not too large."""
         max_size = 1_048_576  # 1MB
+        # Code-point bounds avoid encoding a copy just to measure it:
+        # UTF-8 is 1-4 bytes per character, so len(v) <= bytes <= 4*len(v)
+        n = len(v)
+        if n > max_size:
+            raise ValueError(f"Diff exceeds maximum size of {max_size} bytes")
+        if n * 4 <= max_size:
+            return v
         if len(v.encode("utf-8")) > max_size:
             raise ValueError(f"Diff exceeds maximum size of {max_size} bytes")
         return v
@@ -92,6 +119,10 @@ class ReviewMetadata(BaseModel):
 class ReviewResponse(BaseModel):
     """Structured code review response."""
 
+    # The guardrail orchestrator rebinds findings wholesale after its
+    # single-pass filter; skip re-validation of the already-valid models
+    model_config = ConfigDict(validate_assignment=False)
+
     summary: str = Field(..., description="High-level summary of the review")
     score: float = Field(
         ..., ge=0.0, le=10.0, description="Overall code quality score (0-10)"
@@ -101,15 +132,24 @@ class ReviewResponse(BaseModel):
     )
     metadata: ReviewMetadata = Field(..., description="Execution metadata")
 
+    @cached_property
+    def severity_counts(self) -> Counter:
+        """Findings per severity, counted in one cached pass.
+
+        Callers that rebind findings (the guardrail layer) must drop the
+        cache via __dict__.pop("severity_counts", None).
+        """
+        return Counter(f.severity for f in self.findings)
+
     @property
     def critical_count(self) -> int:
         """Count of critical severity findings."""
-        return sum(1 for f in self.findings if f.severity == FindingSeverity.CRITICAL)
+        return self.severity_counts[FindingSeverity.CRITICAL]
 
     @property
     def high_count(self) -> int:
         """Count of high severity findings."""
-        return sum(1 for f in self.findings if f.severity == FindingSeverity.HIGH)
+        return self.severity_counts[FindingSeverity.HIGH]
 
     @property
     def findings_by_category(self) -> dict[FindingCategory, list[ReviewFinding]]:
@@ -133,28 +173,32 @@ class ReviewResponse(BaseModel):
             lines.append("✅ No issues found! Great work!")
             return "\n".join(lines)
 
-        # Group by severity
-        critical = [f for f in self.findings if f.severity == FindingSeverity.CRITICAL]
-        high = [f for f in self.findings if f.severity == FindingSeverity.HIGH]
-        medium = [f for f in self.findings if f.severity == FindingSeverity.MEDIUM]
-        low = [f for f in self.findings if f.severity == FindingSeverity.LOW]
+        # Group by severity in one pass instead of four list comprehensions
+        buckets: list[list[ReviewFinding]] = [[], [], [], []]
+        for f in self.findings:
+            buckets[_SEVERITY_INDEX[f.severity]].append(f)
+        critical, high, medium, low = buckets
+
+        append = lines.append  # local alias: skip the attribute lookup per call
 
-        def format_findings(findings: list[ReviewFinding], emoji: str, title: str) -> list[str]:
+        def format_findings(findings: list[ReviewFinding], emoji: str, title: str) -> None:
             if not findings:
-                return []
-            result = [f"### {emoji} {title}", ""]
+                return
+            append(f"### {emoji} {title}")
+            append("")
             for f in findings:
                 location = f"`{f.file}:{f.line}`" if f.line else f"`{f.file}`"
-                result.append(f"- **{f.category.value.title()}** in {location}")
-                result.append(f"  > {f.message}")
-                result.append(f"  > **Suggestion:** {f.suggestion}")
-                result.append("")
-            return result
-
-        lines.extend(format_findings(critical, "🔴", "Critical Issues"))
-        lines.extend(format_findings(high, "🟠", "High Severity"))
-        lines.extend(format_findings(medium, "🟡", "Medium Severity"))
-        lines.extend(format_findings(low, "🟢", "Low Severity"))
+                # One rendered block per finding instead of four appends
+                append(
+                    f"- **{f.category.value.title()}** in {location}\n"
+                    f"  > {f.message}\n"
+                    f"  > **Suggestion:** {f.suggestion}\n"
+                )
+
+        format_findings(critical, "🔴", "Critical Issues")
+        format_findings(high, "🟠", "High Severity")
+        format_findings(medium, "🟡", "Medium Severity")
+        format_findings(low, "🟢", "Low Severity")
 
         # Footer
         lines.extend(
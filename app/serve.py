@@ -8,8 +8,8 @@ from fastapi import FastAPI
 
 from app.api import app as fastapi_app
 from app.config import config
-from app.crew.crew import CodeReviewCrew
-from app.guardrails import GuardrailOrchestrator
+from app.crew.crew import get_crew
+from app.guardrails import get_guardrail_orchestrator
 from app.schemas import ReviewRequest, ReviewResponse
 
 logger = logging.getLogger(__name__)
@@ -36,9 +36,12 @@ class CodeReviewDeployment:
         logger.info("Initializing CodeReviewDeployment")
         config.configure_logging()
 
-        # Initialize crew and guardrails (warm up)
-        self.crew = CodeReviewCrew()
-        self.guardrails = GuardrailOrchestrator()
+        # Initialize crew and guardrails (warm up). The module-level
+        # singletons are shared per worker process, so replica restarts
+        # and the FastAPI app in the same process reuse one parsed
+        # config + agent set instead of rebuilding per replica.
+        self.crew = get_crew()
+        self.guardrails = get_guardrail_orchestrator()
 
         logger.info(
             f"CodeReviewDeployment initialized with {config.ray_num_replicas} replicas"
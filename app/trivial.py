@@ -0,0 +1,90 @@
+"""Short-circuit detection for diffs that need no LLM review."""
+
+import logging
+import re
+from typing import Optional
+
+from app.config import config
+from app.schemas import ReviewMetadata, ReviewResponse
+from app.utils import extract_files_from_diff
+
+logger = logging.getLogger(__name__)
+
+# File extensions whose changes are generated, not authored
+_GENERATED_EXTENSIONS = frozenset({"lock", "sum", "svg", "min.js", "map"})
+
+# Line prefixes that mark a comment in the common languages this
+# service reviews; deliberately conservative - anything unrecognized
+# counts as substantive. Block-comment continuations match only "* "
+# and "*/": a bare "*" would also swallow real code such as pointer
+# dereferences (`*flag = true;`) or `*args,` signature lines.
+_COMMENT_PREFIXES = ("#", "//", "/*", "* ", "*/", "--", "<!--", "'''", '"""')
+
+# Changed-content lines in a unified diff (excluding the +++/--- headers)
+_CHANGED_LINE_PATTERN = re.compile(r"^[+-](?![+-]{2} )(.*)$", re.MULTILINE)
+
+
+def _is_generated_file(path: str) -> bool:
+    """Check whether a path looks like a generated/lock file."""
+    name = path.rsplit("/", 1)[-1].lower()
+    return any(name.endswith("." + ext) for ext in _GENERATED_EXTENSIONS)
+
+
+def is_trivial(diff: str) -> Optional[ReviewResponse]:
+    """
+    Detect diffs with no substantive changes and build a canned response.
+
+    Whitespace-only edits, comment-only edits and generated-file updates
+    (lockfiles, checksums, SVGs) gain nothing from a 5-agent LLM review;
+    returning a canned response costs zero tokens and sub-millisecond
+    latency.
+
+    Args:
+        diff: Sanitized git diff content
+
+    Returns:
+        A canned ReviewResponse when the diff is trivial, otherwise None
+    """
+    files = extract_files_from_diff(diff)
+    if files and all(_is_generated_file(f) for f in files):
+        return _canned_response("Generated-file update only (lockfiles or assets)")
+
+    substantive = False
+    saw_changed_line = False
+    for match in _CHANGED_LINE_PATTERN.finditer(diff):
+        saw_changed_line = True
+        content = match.group(1).strip()
+        if not content:
+            continue  # whitespace-only change
+        if content.startswith(_COMMENT_PREFIXES):
+            continue  # comment-only change
+        substantive = True
+        break
+
+    if substantive:
+        return None
+
+    # No file headers and no +/- content lines means this is not
+    # recognizably a diff at all (prose, or raw code pasted without
+    # markers) - that is the crew's call, not a trivial skip
+    if not saw_changed_line and not files:
+        return None
+
+    return _canned_response("Whitespace or comment-only changes")
+
+
+def _canned_response(reason: str) -> ReviewResponse:
+    """Build the zero-finding response for a trivial diff."""
+    logger.info("Trivial diff detected (%s), skipping crew", reason)
+    return ReviewResponse(
+        summary=f"No substantive changes detected: {reason.lower()}. No review needed.",
+        score=10.0,
+        findings=[],
+        metadata=ReviewMetadata(
+            execution_time_ms=0,
+            tokens_used=0,
+            agent_count=0,
+            guardrails_applied=["trivial_skip"],
+            model=config.llm_model,
+        ),
+    )
@@ -13,14 +13,12 @@ from typing import Optional
 import httpx
 
 
-def verify_health(base_url: str) -> bool:
+def verify_health(client: httpx.Client) -> bool:
     """Verify the health endpoint is responding correctly."""
-    health_url = f"{base_url}/health"
-    
-    print(f"🔍 Checking health endpoint: {health_url}")
+    print(f"🔍 Checking health endpoint: {client.base_url}/health")
     
     try:
-        response = httpx.get(health_url, timeout=10.0)
+        response = client.get("/health", timeout=10.0)
         response.raise_for_status()
         
         data = response.json()
@@ -38,14 +36,12 @@ def verify_health(base_url: str) -> bool:
         return False
 
 
-def verify_review(base_url: str, api_key: Optional[str] = None) -> bool:
+def verify_review(client: httpx.Client, api_key: Optional[str] = None) -> bool:
     """Verify the review endpoint with a sample request."""
     if not api_key:
         print("⚠️  Skipping review test (no API key provided)")
         return True
     
-    review_url = f"{base_url}/review"
-    
     # Simple test diff
     sample_request = {
         "diff": """diff --git a/test.py b/test.py
@@ -65,13 +61,13 @@ def verify_review(base_url: str, api_key: Optional[str] = None) -> bool:
         "Content-Type": "application/json"
     }
     
-    print(f"\n🔍 Testing review endpoint: {review_url}")
+    print(f"\n🔍 Testing review endpoint: {client.base_url}/review")
     print(f"⏳ This may take 15-45 seconds...")
     
     try:
         start_time = time.time()
-        response = httpx.post(
-            review_url,
+        response = client.post(
+            "/review",
             json=sample_request,
             headers=headers,
             timeout=120.0
@@ -127,17 +123,20 @@ def main():
     print("=" * 60)
     print(f"Target: {base_url}\n")
     
-    # Test health endpoint
-    health_ok = verify_health(base_url)
-    
-    if not health_ok:
-        print("\n❌ Deployment verification failed!")
-        sys.exit(1)
-    
-    # Test review endpoint if requested
-    review_ok = True
-    if not args.skip_review and args.api_key:
-        review_ok = verify_review(base_url, args.api_key)
+    # One pooled client for all checks: the TCP+TLS handshake is paid
+    # once and reused between the health and review calls
+    with httpx.Client(base_url=base_url, timeout=120.0) as client:
+        # Test health endpoint
+        health_ok = verify_health(client)
+        
+        if not health_ok:
+            print("\n❌ Deployment verification failed!")
+            sys.exit(1)
+        
+        # Test review endpoint if requested
+        review_ok = True
+        if not args.skip_review and args.api_key:
+            review_ok = verify_review(client, args.api_key)
     
     print("\n" + "=" * 60)
     if health_ok and review_ok:
@@ -0,0 +1,13 @@
+"""Shared pytest configuration for the test suite."""
+
+import sys
+
+if sys.platform != "win32":
+    import asyncio
+
+    import uvloop
+
+    # libuv-based event loop: lower per-await overhead for the
+    # HTTP-heavy integration tests. The policy must be installed before
+    # pytest-asyncio creates the session event loop.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
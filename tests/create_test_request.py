@@ -1,8 +1,9 @@
 """Integration test for the code review API."""
 
-import json
 from pathlib import Path
 
+import orjson
+
 # Sample test request
 sample_diff = """diff --git a/app/auth.py b/app/auth.py
 new file mode 100644
@@ -29,6 +30,8 @@ sample_request = {
 
 # Save to file for testing
 test_dir = Path(__file__).parent
-(test_dir / "sample_request.json").write_text(json.dumps(sample_request, indent=2))
+(test_dir / "sample_request.json").write_bytes(
+    orjson.dumps(sample_request, option=orjson.OPT_INDENT_2)
+)
 
 print("✓ Test request file created: tests/sample_request.json")
@@ -2,10 +2,19 @@
 
 This module provides various code diff scenarios to test different aspects
 of the code review agents, including security, performance, and quality issues.
+The diffs are materialized lazily on first access so test collection does
+not pay for fixtures a run never touches.
 """
 
-# Security Issue: SQL Injection
-SQL_INJECTION_DIFF = """diff --git a/app/auth.py b/app/auth.py
+from collections.abc import Mapping
+from functools import cache
+
+
+@cache
+def _load_diffs() -> dict[str, str]:
+    """Build the fixture diff table on first access."""
+    # Security Issue: SQL Injection
+    sql_injection = """diff --git a/app/auth.py b/app/auth.py
 new file mode 100644
 index 0000000..abcdef
 --- /dev/null
@@ -17,8 +26,8 @@ index 0000000..abcdef
 +    return db.execute(query)
 """
 
-# Security Issue: XSS Vulnerability
-XSS_VULNERABILITY_DIFF = """diff --git a/app/views.py b/app/views.py
+    # Security Issue: XSS Vulnerability
+    xss_vulnerability = """diff --git a/app/views.py b/app/views.py
 new file mode 100644
 index 0000000..xyz789
 --- /dev/null
@@ -30,8 +39,8 @@ index 0000000..xyz789
 +    return html
 """
 
-# Security Issue: Hardcoded Secrets
-HARDCODED_SECRETS_DIFF = """diff --git a/app/config.py b/app/config.py
+    # Security Issue: Hardcoded Secrets
+    hardcoded_secrets = """diff --git a/app/config.py b/app/config.py
 new file mode 100644
 index 0000000..abc456
 --- /dev/null
@@ -43,8 +52,8 @@ index 0000000..abc456
 +SECRET_TOKEN = "my-super-secret-token-12345"
 """
 
-# Performance Issue: N+1 Query Problem
-N_PLUS_ONE_QUERY_DIFF = """diff --git a/app/models.py b/app/models.py
+    # Performance Issue: N+1 Query Problem
+    n_plus_one = """diff --git a/app/models.py b/app/models.py
 new file mode 100644
 index 0000000..def789
 --- /dev/null
@@ -60,8 +69,8 @@ index 0000000..def789
 +    return result
 """
 
-# Performance Issue: Inefficient Algorithm
-INEFFICIENT_ALGORITHM_DIFF = """diff --git a/app/utils.py b/app/utils.py
+    # Performance Issue: Inefficient Algorithm
+    inefficient_algorithm = """diff --git a/app/utils.py b/app/utils.py
 new file mode 100644
 index 0000000..ghi012
 --- /dev/null
@@ -77,8 +86,8 @@ index 0000000..ghi012
 +    return duplicates
 """
 
-# Code Quality Issue: Poor Naming and Complexity
-POOR_QUALITY_DIFF = """diff --git a/app/processor.py b/app/processor.py
+    # Code Quality Issue: Poor Naming and Complexity
+    poor_quality = """diff --git a/app/processor.py b/app/processor.py
 new file mode 100644
 index 0000000..jkl345
 --- /dev/null
@@ -99,8 +108,8 @@ index 0000000..jkl345
 +    return r
 """
 
-# Clean Code Example (Baseline)
-CLEAN_CODE_DIFF = """diff --git a/app/services/user_service.py b/app/services/user_service.py
+    # Clean Code Example (Baseline)
+    clean_code = """diff --git a/app/services/user_service.py b/app/services/user_service.py
 new file mode 100644
 index 0000000..mno678
 --- /dev/null
@@ -113,21 +122,21 @@ index 0000000..mno678
 +
 +class UserService:
 +    \"\"\"Service layer for user operations.\"\"\"
-+    
++
 +    def __init__(self, repository: UserRepository):
 +        self.repository = repository
-+    
++
 +    def get_active_users(self) -> List[User]:
 +        \"\"\"Retrieve all active users from the database.
-+        
++
 +        Returns:
 +            List of active User objects
 +        \"\"\"
 +        return self.repository.find_by_status('active')
 """
 
-# Multiple Issues Combined
-MULTIPLE_ISSUES_DIFF = """diff --git a/app/payment.py b/app/payment.py
+    # Multiple Issues Combined
+    multiple_issues = """diff --git a/app/payment.py b/app/payment.py
 new file mode 100644
 index 0000000..pqr901
 --- /dev/null
@@ -139,25 +148,41 @@ index 0000000..pqr901
 +    # Multiple issues:
 +    # 1. Hardcoded API key (security)
 +    api_key = "sk-live-secret123456"
-+    
++
 +    # 2. SQL injection vulnerability (security)
 +    query = f"INSERT INTO payments (user, amount) VALUES ({user_id}, {amount})"
 +    db.execute(query)
-+    
++
 +    # 3. No error handling (reliability)
 +    # 4. Synchronous blocking call in async context (performance)
-+    response = requests.post("https://api.stripe.com/charge", 
++    response = requests.post("https://api.stripe.com/charge",
 +                            headers={"Authorization": f"Bearer {api_key}"})
 """
 
-# Test fixture mapping
-TEST_DIFFS = {
-    "sql_injection": SQL_INJECTION_DIFF,
-    "xss_vulnerability": XSS_VULNERABILITY_DIFF,
-    "hardcoded_secrets": HARDCODED_SECRETS_DIFF,
-    "n_plus_one": N_PLUS_ONE_QUERY_DIFF,
-    "inefficient_algorithm": INEFFICIENT_ALGORITHM_DIFF,
-    "poor_quality": POOR_QUALITY_DIFF,
-    "clean_code": CLEAN_CODE_DIFF,
-    "multiple_issues": MULTIPLE_ISSUES_DIFF,
-}
+    return {
+        "sql_injection": sql_injection,
+        "xss_vulnerability": xss_vulnerability,
+        "hardcoded_secrets": hardcoded_secrets,
+        "n_plus_one": n_plus_one,
+        "inefficient_algorithm": inefficient_algorithm,
+        "poor_quality": poor_quality,
+        "clean_code": clean_code,
+        "multiple_issues": multiple_issues,
+    }
+
+
+class _LazyDiffs(Mapping):
+    """Read-only mapping over the fixture diffs, built on first use."""
+
+    def __getitem__(self, key: str) -> str:
+        return _load_diffs()[key]
+
+    def __iter__(self):
+        return iter(_load_diffs())
+
+    def __len__(self) -> int:
+        return len(_load_diffs())
+
+
+# Test fixture mapping (source-compatible with the former dict constant)
+TEST_DIFFS = _LazyDiffs()
@@ -9,48 +9,106 @@ This module tests the complete application flow including:
 - Error handling
 """
 
+import asyncio
 import json
+import operator
 import os
+import sys
 import time
+from functools import cache
 from typing import Dict, Any
 
+import orjson
 import pytest
-from httpx import AsyncClient, ASGITransport
-from app.api import app
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport, Headers, Timeout
+from app.api import _rate_buckets, app
 from app.config import config
 from tests.fixtures.test_diffs import TEST_DIFFS
 
 
+def _json(response) -> Any:
+    """Decode a response body with orjson instead of httpx's stdlib parser."""
+    return orjson.loads(response.content)
+
+
+@cache
+def _encoded_review_payload(diff_key: str) -> bytes:
+    """Encode the standard review body for a fixture diff once per run."""
+    return orjson.dumps({"diff": TEST_DIFFS[diff_key], "language": "python"})
+
+
+def _post_json(client: AsyncClient, url: str, payload: Dict[str, Any], headers=None, **kwargs):
+    """POST a payload pre-encoded with orjson, bypassing httpx's encoder."""
+    if headers is None:
+        headers = {"Content-Type": "application/json"}
+    return client.post(url, content=orjson.dumps(payload), headers=headers, **kwargs)
+
+
+# Core response keys fetched with one C-level multi-get
+_GET_CORE = operator.itemgetter("findings", "summary", "score")
+
+# Compiled accessors for the execution-time chain
+_GET_METADATA = operator.itemgetter("metadata")
+_GET_MS = operator.itemgetter("execution_time_ms")
+
+
+def _exec_ms(review_data: Dict[str, Any]) -> int:
+    """Fetch metadata.execution_time_ms via the compiled accessors."""
+    return _GET_MS(_GET_METADATA(review_data))
+
+# Structured review timeout: the read budget covers the service's 120s
+# internal review timeout plus slack, while connect/write/pool are kept
+# tight so anything but the LLM wait fails fast
+REVIEW_TIMEOUT = Timeout(connect=5.0, read=180.0, write=10.0, pool=5.0)
+
+# Pytest captures stdout by default; skip the print-formatting work
+# (including float formatting) unless output will actually be shown
+_VERBOSE = "-s" in sys.argv or bool(os.environ.get("PYTEST_VERBOSE"))
+
 # Test configuration
 BASE_URL = "http://test"
 VALID_API_KEY = config.review_api_key
 INVALID_API_KEY = "invalid-key-12345"
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def client():
-    """Create async HTTP client for testing."""
+    """Shared async HTTP client, created once for the whole session."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url=BASE_URL) as ac:
         yield ac
 
 
-@pytest.fixture
-def auth_headers() -> Dict[str, str]:
-    """Get valid authorization headers."""
-    return {
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
+async def _warmup(client: AsyncClient):
+    """Probe /health once per session; tests then skip per-test checks."""
+    response = await client.head("/health")
+    assert response.status_code == 200
+
+
+@pytest.fixture(scope="session")
+def auth_headers() -> Headers:
+    """Get valid authorization headers, pre-encoded once per session.
+
+    httpx.Headers stores byte pairs internally, so per-request dict
+    conversion disappears. Authorization stays per-call rather than on
+    the shared client: the no-auth and invalid-auth tests must be able
+    to send requests without inheriting valid credentials.
+    """
+    return Headers({
         "Authorization": f"Bearer {VALID_API_KEY}",
         "Content-Type": "application/json"
-    }
+    })
 
 
-@pytest.fixture
-def invalid_auth_headers() -> Dict[str, str]:
-    """Get invalid authorization headers."""
-    return {
+@pytest.fixture(scope="session")
+def invalid_auth_headers() -> Headers:
+    """Get invalid authorization headers, pre-encoded once per session."""
+    return Headers({
         "Authorization": f"Bearer {INVALID_API_KEY}",
         "Content-Type": "application/json"
-    }
+    })
 
 
 # ============================================================================
@@ -63,7 +121,7 @@ async def test_health_check(client: AsyncClient):
     response = await client.get("/health")
     
     assert response.status_code == 200
-    data = response.json()
+    data = _json(response)
     
     assert data["status"] == "healthy"
     assert "version" in data
@@ -76,7 +134,7 @@ async def test_health_check(client: AsyncClient):
 async def test_health_check_configuration(client: AsyncClient):
     """Test that health check exposes correct configuration."""
     response = await client.get("/health")
-    data = response.json()
+    data = _json(response)
     
     # Verify LLM provider matches configuration
     assert data["llm_provider"] == config.llm_provider
@@ -88,7 +146,7 @@ async def test_health_check_configuration(client: AsyncClient):
 # ============================================================================
 
 @pytest.mark.asyncio
-async def test_review_with_valid_api_key(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_with_valid_api_key(client: AsyncClient, auth_headers: Headers):
     """Test that valid API key is accepted."""
     request_data = {
         "diff": TEST_DIFFS["clean_code"],
@@ -101,7 +159,7 @@ async def test_review_with_valid_api_key(client: AsyncClient, auth_headers: Dict
         }
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers)
+    response = await _post_json(client, "/review", request_data, auth_headers)
     
     # Should not be unauthorized
     assert response.status_code != 401
@@ -110,7 +168,7 @@ async def test_review_with_valid_api_key(client: AsyncClient, auth_headers: Dict
 
 
 @pytest.mark.asyncio
-async def test_review_with_invalid_api_key(client: AsyncClient, invalid_auth_headers: Dict[str, str]):
+async def test_review_with_invalid_api_key(client: AsyncClient, invalid_auth_headers: Headers):
     """Test that invalid API key is rejected."""
     request_data = {
         "diff": TEST_DIFFS["clean_code"],
@@ -118,10 +176,10 @@ async def test_review_with_invalid_api_key(client: AsyncClient, invalid_auth_hea
         "context": {}
     }
     
-    response = await client.post("/review", json=request_data, headers=invalid_auth_headers)
+    response = await _post_json(client, "/review", request_data, invalid_auth_headers)
     
     assert response.status_code == 401
-    data = response.json()
+    data = _json(response)
     assert "error" in data
     assert "Invalid API key" in data["error"]
 
@@ -135,7 +193,7 @@ async def test_review_without_auth_header(client: AsyncClient):
         "context": {}
     }
     
-    response = await client.post("/review", json=request_data)
+    response = await _post_json(client, "/review", request_data)
     
     assert response.status_code == 403
 
@@ -144,40 +202,73 @@ async def test_review_without_auth_header(client: AsyncClient):
 # RATE LIMITING TESTS
 # ============================================================================
 
+@pytest.mark.xdist_group("rate-limit")
 @pytest.mark.asyncio
-async def test_rate_limiting(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_rate_limiting(client: AsyncClient, auth_headers: Headers):
     """Test that rate limiting is enforced."""
-    request_data = {
-        "diff": TEST_DIFFS["clean_code"],
-        "language": "python",
-        "context": {}
-    }
-    
-    # Make requests up to the limit
+    # Fire the whole burst concurrently - the goal is only to trigger a
+    # 429, so there is no need for serial round-trips with sleeps
     rate_limit = config.rate_limit_per_minute
-    responses = []
-    
-    for i in range(rate_limit + 2):
-        response = await client.post("/review", json=request_data, headers=auth_headers)
-        responses.append(response.status_code)
+    try:
+        responses = await asyncio.gather(
+            *[
+                client.post(
+                    "/review",
+                    content=_encoded_review_payload("clean_code"),
+                    headers=auth_headers,
+                )
+                for _ in range(rate_limit + 2)
+            ],
+            return_exceptions=True,
+        )
+        statuses = [r.status_code for r in responses if not isinstance(r, Exception)]
         
-        # Small delay to avoid overwhelming
-        if i < rate_limit:
-            await asyncio.sleep(0.1)
-    
-    # At least one request should be rate limited
-    assert 429 in responses
+        # At least one request should be rate limited
+        assert 429 in statuses
+    finally:
+        # The burst drains the shared token bucket; restore it so later
+        # tests in the session are not rejected by the limiter
+        _rate_buckets.clear()
 
 
 # ============================================================================
 # CODE REVIEW FUNCTIONALITY TESTS
 # ============================================================================
 
+@pytest.mark.parametrize(
+    "fixture_name,expected_category,keywords,min_findings,min_categories",
+    [
+        pytest.param(
+            "sql_injection",
+            "security",
+            ("sql", "injection", "parameterized", "query"),
+            1,
+            1,
+            id="sql-injection",
+        ),
+        pytest.param(
+            "multiple_issues",
+            "security",
+            ("sql", "injection", "secret", "key"),
+            2,
+            2,
+            id="multiple-issues",
+        ),
+    ],
+)
 @pytest.mark.asyncio
-async def test_review_sql_injection_detection(client: AsyncClient, auth_headers: Dict[str, str]):
-    """Test that SQL injection vulnerability is detected."""
+async def test_review_detects_issues(
+    client: AsyncClient,
+    auth_headers: Headers,
+    fixture_name: str,
+    expected_category: str,
+    keywords: tuple,
+    min_findings: int,
+    min_categories: int,
+):
+    """Test that known-bad diffs produce findings of the expected shape."""
     request_data = {
-        "diff": TEST_DIFFS["sql_injection"],
+        "diff": TEST_DIFFS[fixture_name],
         "language": "python",
         "context": {
             "repo": "test/security",
@@ -187,10 +278,10 @@ async def test_review_sql_injection_detection(client: AsyncClient, auth_headers:
         }
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await _post_json(client, "/review", request_data, auth_headers, timeout=REVIEW_TIMEOUT)
     
     assert response.status_code == 200
-    data = response.json()
+    data = _json(response)
     
     # Verify response structure
     assert "findings" in data
@@ -200,30 +291,32 @@ async def test_review_sql_injection_detection(client: AsyncClient, auth_headers:
     
     # Verify findings
     findings = data["findings"]
-    assert len(findings) > 0
+    assert len(findings) >= min_findings
+    
+    categories = set(f["category"] for f in findings)
+    assert len(categories) >= min_categories
     
-    # Check that security issue is detected
-    security_findings = [f for f in findings if f["category"] == "security"]
-    assert len(security_findings) > 0
+    # Check that the expected category is detected
+    matching = [f for f in findings if f["category"] == expected_category]
+    assert len(matching) > 0
     
-    # Verify at least one finding mentions SQL or injection
-    finding_texts = " ".join([f["message"] + " " + f.get("suggestion", "") for f in security_findings])
-    assert any(keyword in finding_texts.lower() for keyword in ["sql", "injection", "parameterized", "query"])
+    # Verify at least one finding mentions one of the expected keywords
+    finding_texts = " ".join([f["message"] + " " + f.get("suggestion", "") for f in matching])
+    assert any(keyword in finding_texts.lower() for keyword in keywords)
 
 
 @pytest.mark.asyncio
-async def test_review_response_structure(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_response_structure(client: AsyncClient, auth_headers: Headers):
     """Test that review response has the correct structure."""
-    request_data = {
-        "diff": TEST_DIFFS["clean_code"],
-        "language": "python",
-        "context": {}
-    }
-    
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await client.post(
+        "/review",
+        content=_encoded_review_payload("clean_code"),
+        headers=auth_headers,
+        timeout=REVIEW_TIMEOUT,
+    )
     
     assert response.status_code == 200
-    data = response.json()
+    data = _json(response)
     
     # Verify top-level fields
     assert "summary" in data
@@ -252,50 +345,25 @@ async def test_review_response_structure(client: AsyncClient, auth_headers: Dict
 
 
 @pytest.mark.asyncio
-async def test_review_multiple_issues_detection(client: AsyncClient, auth_headers: Dict[str, str]):
-    """Test detection of multiple issues in a single diff."""
-    request_data = {
-        "diff": TEST_DIFFS["multiple_issues"],
-        "language": "python",
-        "context": {}
-    }
-    
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    findings = data["findings"]
-    
-    # Should detect multiple issues
-    assert len(findings) >= 2
-    
-    # Should have different categories
-    categories = set(f["category"] for f in findings)
-    assert len(categories) > 1
-
-
-@pytest.mark.asyncio
-async def test_review_performance_timing(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_performance_timing(client: AsyncClient, auth_headers: Headers):
     """Test that review completes within acceptable time."""
-    request_data = {
-        "diff": TEST_DIFFS["clean_code"],
-        "language": "python",
-        "context": {}
-    }
-    
     start_time = time.time()
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await client.post(
+        "/review",
+        content=_encoded_review_payload("clean_code"),
+        headers=auth_headers,
+        timeout=REVIEW_TIMEOUT,
+    )
     duration = time.time() - start_time
     
     assert response.status_code == 200
-    data = response.json()
+    data = _json(response)
     
     # Should complete within timeout (120s default + buffer)
     assert duration < 150
     
     # Metadata should reflect execution time
-    reported_time_ms = data["metadata"]["execution_time_ms"]
+    reported_time_ms = _exec_ms(data)
     assert reported_time_ms > 0
     assert reported_time_ms < 150000  # 150 seconds in ms
 
@@ -305,7 +373,7 @@ async def test_review_performance_timing(client: AsyncClient, auth_headers: Dict
 # ============================================================================
 
 @pytest.mark.asyncio
-async def test_review_with_invalid_diff(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_with_invalid_diff(client: AsyncClient, auth_headers: Headers):
     """Test handling of invalid diff format."""
     request_data = {
         "diff": "This is not a valid diff format",
@@ -313,14 +381,14 @@ async def test_review_with_invalid_diff(client: AsyncClient, auth_headers: Dict[
         "context": {}
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await _post_json(client, "/review", request_data, auth_headers, timeout=REVIEW_TIMEOUT)
     
     # Should either accept it (agents will analyze) or return error
     assert response.status_code in [200, 400, 422, 500]
 
 
 @pytest.mark.asyncio
-async def test_review_with_empty_diff(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_with_empty_diff(client: AsyncClient, auth_headers: Headers):
     """Test handling of empty diff."""
     request_data = {
         "diff": "",
@@ -328,25 +396,24 @@ async def test_review_with_empty_diff(client: AsyncClient, auth_headers: Dict[st
         "context": {}
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await _post_json(client, "/review", request_data, auth_headers, timeout=REVIEW_TIMEOUT)
     
     # Should handle gracefully
     assert response.status_code in [200, 400, 422]
 
 
 @pytest.mark.asyncio
-async def test_review_findings_limit(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_findings_limit(client: AsyncClient, auth_headers: Headers):
     """Test that findings are limited by guardrails."""
-    request_data = {
-        "diff": TEST_DIFFS["multiple_issues"],
-        "language": "python",
-        "context": {}
-    }
-    
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await client.post(
+        "/review",
+        content=_encoded_review_payload("multiple_issues"),
+        headers=auth_headers,
+        timeout=REVIEW_TIMEOUT,
+    )
     
     if response.status_code == 200:
-        data = response.json()
+        data = _json(response)
         findings = data["findings"]
         
         # Should not exceed max findings limit
@@ -358,20 +425,20 @@ async def test_review_findings_limit(client: AsyncClient, auth_headers: Dict[str
 # ============================================================================
 
 @pytest.mark.asyncio
-async def test_review_with_missing_fields(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_with_missing_fields(client: AsyncClient, auth_headers: Headers):
     """Test handling of request with missing required fields."""
     request_data = {
         "language": "python"
         # Missing 'diff' field
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers)
+    response = await _post_json(client, "/review", request_data, auth_headers)
     
     assert response.status_code == 422  # Validation error
 
 
 @pytest.mark.asyncio
-async def test_review_with_invalid_language(client: AsyncClient, auth_headers: Dict[str, str]):
+async def test_review_with_invalid_language(client: AsyncClient, auth_headers: Headers):
     """Test handling of unsupported language."""
     request_data = {
         "diff": TEST_DIFFS["clean_code"],
@@ -379,7 +446,7 @@ async def test_review_with_invalid_language(client: AsyncClient, auth_headers: D
         "context": {}
     }
     
-    response = await client.post("/review", json=request_data, headers=auth_headers, timeout=180.0)
+    response = await _post_json(client, "/review", request_data, auth_headers, timeout=REVIEW_TIMEOUT)
     
     # Should either accept it or validate
     assert response.status_code in [200, 400, 422]
@@ -389,16 +456,24 @@ async def test_review_with_invalid_language(client: AsyncClient, auth_headers: D
 # INTEGRATION TESTS
 # ============================================================================
 
+@pytest.mark.parametrize(
+    "diff_key,min_security_findings",
+    [
+        pytest.param("sql_injection", 1, id="sql-injection"),
+        pytest.param("xss_vulnerability", 1, id="xss"),
+        pytest.param("clean_code", 0, id="clean"),
+    ],
+)
 @pytest.mark.asyncio
-async def test_full_review_workflow(client: AsyncClient, auth_headers: Dict[str, str]):
-    """Test complete end-to-end review workflow."""
-    # 1. Check health
-    health_response = await client.get("/health")
-    assert health_response.status_code == 200
-    
-    # 2. Submit review with security issue
+async def test_full_review_workflow(
+    client: AsyncClient,
+    auth_headers: Headers,
+    diff_key: str,
+    min_security_findings: int,
+):
+    """Test complete end-to-end review workflow across diff scenarios."""
     review_request = {
-        "diff": TEST_DIFFS["sql_injection"],
+        "diff": TEST_DIFFS[diff_key],
         "language": "python",
         "context": {
             "repo": "test/integration",
@@ -408,38 +483,50 @@ async def test_full_review_workflow(client: AsyncClient, auth_headers: Dict[str,
         }
     }
     
-    review_response = await client.post(
-        "/review", 
-        json=review_request, 
-        headers=auth_headers,
-        timeout=180.0
-    )
-    
-    assert review_response.status_code == 200
-    review_data = review_response.json()
-    
-    # 3. Verify complete response
-    assert "findings" in review_data
-    assert "summary" in review_data
-    assert "score" in review_data
-    assert review_data["score"] >= 0
-    
-    # 4. Verify security findings present
-    security_findings = [
-        f for f in review_data["findings"] 
-        if f["category"] == "security"
-    ]
-    assert len(security_findings) > 0
-    
-    print(f"\n✅ Full workflow test passed!")
-    print(f"   - Findings: {len(review_data['findings'])}")
-    print(f"   - Security issues: {len(security_findings)}")
-    print(f"   - Quality score: {review_data['score']:.1f}/10")
-    print(f"   - Execution time: {review_data['metadata']['execution_time_ms']}ms")
+    async def post_review_streamed() -> tuple:
+        """POST the review and stream the body into one bytearray."""
+        async with client.stream(
+            "POST",
+            "/review",
+            content=orjson.dumps(review_request),
+            headers=auth_headers,
+            timeout=REVIEW_TIMEOUT,
+        ) as resp:
+            body = bytearray()
+            async for chunk in resp.aiter_raw():
+                body.extend(chunk)
+            return resp.status_code, bytes(body)
+    
+    # Reachability is covered by the session-level warmup probe, so the
+    # workflow goes straight to the review; the body streams into a
+    # single preallocated buffer rather than being buffered by httpx and
+    # copied again on .json()
+    review_status, review_body = await post_review_streamed()
+    
+    assert review_status == 200
+    review_data = orjson.loads(review_body)
+    
+    # 3. Verify complete response: one C-level multi-get; a missing key
+    # raises KeyError, which pytest surfaces as a failure
+    findings, summary, score = _GET_CORE(review_data)
+    assert score >= 0
+    
+    # 4. Verify a security finding is present where the scenario expects
+    # one; any() stops at the first match instead of materializing a list
+    if min_security_findings:
+        assert any(f["category"] == "security" for f in findings), "no security finding"
+    
+    if _VERBOSE:
+        print(f"\n✅ Full workflow test passed!")
+        print(f"   - Findings: {len(findings)}")
+        print(f"   - Security issues: {sum(1 for f in findings if f['category'] == 'security')}")
+        print(f"   - Quality score: {score:.1f}/10")
+        print(f"   - Execution time: {_exec_ms(review_data)}ms")
 
 
-# Add asyncio support
-import asyncio
-
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "--tb=short"])
+    # loadgroup distributes test-by-test (real parallelism on a single
+    # file) while the xdist_group mark pins the rate-limit burst to one
+    # worker; app state is per worker process, so workers do not share
+    # the token bucket
+    pytest.main([__file__, "-v", "--tb=short", "-n", "auto", "--dist", "loadgroup"])